@@ -1,16 +1,38 @@
 """
 REST API Service for Bot Factory
 Exposes endpoints to dynamically create and manage Slack bots
+
+Bot I/O runs on the factory's asyncio loop thread, so serve with plain OS threads
+(no gevent monkey-patching) and a single worker process that owns all bots:
+    gunicorn -k gthread -w 1 --threads 32 api_service:app
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import atexit
 import logging
+from typing import Optional
+from pydantic import BaseModel, Field, ValidationError
 from bot_factory import BotFactory
+from json_provider import ORJSONProvider
+from logging_config import configure_logging
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 bot_factory = BotFactory()
+atexit.register(bot_factory.shutdown)
+
+
+class CreateBotReq(BaseModel):
+    """Request body for POST /bots"""
+    bot_token: str = Field(min_length=1)
+    app_token: str = Field(min_length=1)
+    signing_secret: str = Field(min_length=1)
+    agent_url: str = Field(min_length=1)
+    channel_id: Optional[str] = None
+    bot_id: Optional[str] = None
+    auto_start: bool = False
 
 
 @app.route('/health', methods=['GET'])
@@ -36,35 +58,34 @@ def create_bot():
     }
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['bot_token', 'app_token', 'signing_secret', 'agent_url']
-        missing_fields = [field for field in required_fields if not data.get(field)]
-        
-        if missing_fields:
+        # Validate request body
+        try:
+            req = CreateBotReq.model_validate(request.get_json(silent=True))
+        except ValidationError as e:
+            fields = sorted({".".join(str(part) for part in err["loc"]) or "body" for err in e.errors()})
             return jsonify({
-                "error": f"Missing required fields: {', '.join(missing_fields)}"
+                "error": f"Missing or invalid fields: {', '.join(fields)}",
+                "details": e.errors(include_url=False, include_context=False, include_input=False)
             }), 400
         
         # Create bot
         bot_id = bot_factory.create_bot(
-            bot_token=data['bot_token'],
-            app_token=data['app_token'],
-            signing_secret=data['signing_secret'],
-            agent_url=data['agent_url'],
-            channel_id=data.get('channel_id'),
-            bot_id=data.get('bot_id')
+            bot_token=req.bot_token,
+            app_token=req.app_token,
+            signing_secret=req.signing_secret,
+            agent_url=req.agent_url,
+            channel_id=req.channel_id,
+            bot_id=req.bot_id
         )
         
         # Auto-start if requested
-        if data.get('auto_start', False):
+        if req.auto_start:
             bot_factory.start_bot(bot_id)
         
         return jsonify({
             "bot_id": bot_id,
             "status": "created",
-            "agent_url": data['agent_url']
+            "agent_url": req.agent_url
         }), 201
     
     except ValueError as e:
@@ -78,8 +99,7 @@ def create_bot():
 def list_bots():
     """List all bot instances"""
     try:
-        bots = bot_factory.list_bots()
-        return jsonify({"bots": bots, "count": len(bots)}), 200
+        return Response(bot_factory.list_bots_json(), mimetype='application/json'), 200
     except Exception as e:
         logger.error(f"Error listing bots: {e}")
         return jsonify({"error": "Internal server error"}), 500
@@ -162,8 +182,10 @@ def stop_all_bots():
 
 if __name__ == '__main__':
     import os
+    from waitress import serve
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('DEBUG', 'false').lower() == 'true'
     
     logger.info(f"🚀 Starting Bot Factory API on port {port}")
-    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
\ No newline at end of file
+    app.debug = debug
+    serve(app, host='0.0.0.0', port=port, threads=32)
\ No newline at end of file
@@ -2,23 +2,190 @@
 Slack Bot Factory Service
 Dynamically creates and manages multiple Slack bot instances, each connected to different agent endpoints
 """
+import asyncio
 import logging
+import os
+import queue
+import re
 import threading
-from typing import Dict, Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import uuid
-from slack_bolt import App
-from slack_bolt.adapter.socket_mode import SocketModeHandler
-import requests
+import httpx
+import orjson
+from cachetools import TTLCache
+from logging_config import configure_logging
 
-logging.basicConfig(level=logging.INFO)
+# slack_bolt and requests are imported where used so that importing this module
+# (e.g. for the API's /health endpoint) doesn't pay their import cost up front
+if TYPE_CHECKING:
+    import requests
+
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Agent response cache (opt-in); entries are scoped to one user's conversation thread
+AGENT_CACHE_TTL = int(os.getenv("AGENT_CACHE_TTL", "0"))
+# Responses matching this pattern are considered time-sensitive and never cached
+AGENT_CACHE_SKIP_PATTERN = os.getenv(
+    "AGENT_CACHE_SKIP_PATTERN", r"\b(today|tomorrow|yesterday|now|currently|latest)\b"
+)
+
+# Coalesce concurrent calls to the same agent URL into batched POSTs.
+# Requires an agent that accepts {"batch": [...]} and returns results in order.
+BATCH_ENABLED = os.getenv("BATCH_ENABLED", "false").lower() == "true"
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT = float(os.getenv("BATCH_MAX_WAIT", "0.25"))
+
+# Outgoing Slack message pacing per bot (Slack guideline: ~1 message/sec)
+SAY_RATE = float(os.getenv("SAY_RATE", "1.0"))
+SAY_BURST = int(os.getenv("SAY_BURST", "5"))
+
+
+def _create_session() -> "requests.Session":
+    """Create an HTTP session with a pooled, retrying adapter for agent calls"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        # allowed_methods=None: urllib3 only retries idempotent verbs by default, not these POSTs.
+        # read=0/other=0: a POST that may have reached the agent is never resent; only connect
+        # failures and the listed status codes are retried.
+        max_retries=Retry(
+            total=3, connect=3, read=0, other=0, backoff_factor=0.2,
+            status_forcelist=[429, 502, 503, 504], allowed_methods=None
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+class AgentBatcher:
+    """Micro-batches agent payloads for a single agent URL"""
+    
+    def __init__(self, agent_url: str, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait: float = BATCH_MAX_WAIT):
+        self.agent_url = agent_url
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Optional[Tuple[dict, Future]]]" = queue.Queue()
+        self._session = _create_session()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def submit(self, payload: dict) -> Future:
+        """Queue a payload; the returned future resolves to the agent's JSON response"""
+        future: Future = Future()
+        self._queue.put((payload, future))
+        return future
+    
+    def close(self):
+        """Flush pending payloads and stop the background thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._session.close()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            # Collect until the batch is full or the window since the first item elapses
+            batch: List[Tuple[dict, Future]] = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._flush(batch)
+    
+    def _flush(self, batch: List[Tuple[dict, Future]]):
+        # Drop callers that already gave up (their futures were cancelled on timeout)
+        batch = [(payload, future) for payload, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        
+        try:
+            response = self._session.post(
+                self.agent_url,
+                json={"batch": [payload for payload, _ in batch]},
+                timeout=(3.05, 30)
+            )
+            response.raise_for_status()
+            
+            data = response.json()
+            results = data.get("batch") if isinstance(data, dict) else data
+            if not isinstance(results, list) or len(results) != len(batch):
+                raise ValueError(f"Agent {self.agent_url} returned a malformed batch response")
+        except Exception as e:
+            logger.error(f"Batched agent call to {self.agent_url} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+class TokenBucket:
+    """Async token bucket; waiters queue in FIFO order on the bucket lock"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Take one token, waiting in line until one is available (overflow is queued, not dropped)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
 
 class BotInstance:
     """Represents a single Slack bot instance connected to an agent endpoint"""
     
+    __slots__ = (
+        "bot_id", "bot_token", "app_token", "signing_secret", "agent_url",
+        "channel_id", "app", "handler", "running", "bot_user_id", "batcher",
+        "_mention_re", "_loop", "_http", "_bucket"
+    )
+    
+    # Shared across bots; keyed by (agent_url, user, channel, thread, normalized message)
+    _response_cache = TTLCache(maxsize=1024, ttl=AGENT_CACHE_TTL) if AGENT_CACHE_TTL > 0 else None
+    _cache_lock = threading.Lock()
+    _cache_skip_re = re.compile(AGENT_CACHE_SKIP_PATTERN, re.IGNORECASE) if AGENT_CACHE_SKIP_PATTERN else None
+    
     def __init__(self, bot_id: str, bot_token: str, app_token: str, 
-                 signing_secret: str, agent_url: str, channel_id: Optional[str] = None):
+                 signing_secret: str, agent_url: str, channel_id: Optional[str] = None,
+                 *, loop: asyncio.AbstractEventLoop, http_client: httpx.AsyncClient,
+                 batcher: Optional[AgentBatcher] = None):
         self.bot_id = bot_id
         self.bot_token = bot_token
         self.app_token = app_token
@@ -27,21 +194,31 @@ class BotInstance:
         self.channel_id = channel_id
         self.app = None
         self.handler = None
-        self.thread = None
         self.running = False
         self.bot_user_id = None
+        self._mention_re = None
+        
+        # Shared factory event loop and HTTP client
+        self._loop = loop
+        self._http = http_client
+        self.batcher = batcher
+        self._bucket = TokenBucket(rate=SAY_RATE, capacity=SAY_BURST)
         
         logger.info(f"Bot instance {bot_id} initialized for agent: {agent_url}")
     
+    def _run(self, coro):
+        """Run a coroutine on the factory event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
     def _setup_handlers(self):
         """Setup Slack event handlers for this bot instance"""
         
         @self.app.event("app_mention")
-        def handle_mention(event, say, client):
-            self._handle_message(event, say, client, is_mention=True)
+        async def handle_mention(event, say):
+            await self._handle_message(event, say, is_mention=True)
         
         @self.app.event("message")
-        def handle_message(event, say, client):
+        async def handle_message(event, say):
             # Ignore bot messages and message changes
             if event.get("subtype") or event.get("bot_id"):
                 return
@@ -51,9 +228,9 @@ class BotInstance:
             channel = event.get("channel")
             
             if channel_type == "im" or (self.channel_id and channel == self.channel_id):
-                self._handle_message(event, say, client, is_mention=False)
+                await self._handle_message(event, say, is_mention=False)
     
-    def _handle_message(self, event, say, client, is_mention=False):
+    async def _handle_message(self, event, say, is_mention=False):
         """Handle incoming messages and forward to agent endpoint"""
         try:
             user = event.get("user")
@@ -61,31 +238,27 @@ class BotInstance:
             channel = event.get("channel")
             thread_ts = event.get("thread_ts") or event.get("ts")
             
-            # Initialize bot user ID if not set
-            if not self.bot_user_id:
-                auth_response = client.auth_test()
-                self.bot_user_id = auth_response["user_id"]
-            
             # Clean mention from text
-            if is_mention and self.bot_user_id:
-                import re
-                text = re.sub(f"<@{self.bot_user_id}>", "", text).strip()
+            if is_mention and self._mention_re:
+                text = self._mention_re.sub("", text).strip()
             
             if not text:
                 return
             
-            logger.info(f"Bot {self.bot_id} received message: {text[:50]}...")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Bot {self.bot_id} received message: {text[:50]}...")
             
             # Forward to agent endpoint
             try:
-                response = self._call_agent(text, user, channel, thread_ts)
+                response = await self._call_agent(text, user, channel, thread_ts)
                 
                 if response:
-                    say(text=response, thread_ts=thread_ts)
+                    await self._say(say, text=response, thread_ts=thread_ts)
                     logger.info(f"Bot {self.bot_id} sent response")
             except Exception as e:
                 logger.error(f"Error calling agent for bot {self.bot_id}: {e}")
-                say(
+                await self._say(
+                    say,
                     text="Sorry, I encountered an error processing your request.",
                     thread_ts=thread_ts
                 )
@@ -93,8 +266,32 @@ class BotInstance:
         except Exception as e:
             logger.error(f"Error handling message for bot {self.bot_id}: {e}")
     
-    def _call_agent(self, message: str, user: str, channel: str, thread_ts: str) -> str:
+    async def _say(self, say, **kwargs):
+        """Send a message paced by the bot's token bucket, honoring Slack's Retry-After"""
+        from slack_sdk.errors import SlackApiError
+        
+        await self._bucket.acquire()
+        
+        try:
+            return await say(**kwargs)
+        except SlackApiError as e:
+            if e.response.status_code != 429:
+                raise
+            retry_after = float(e.response.headers.get("Retry-After", 1))
+            logger.warning(f"Bot {self.bot_id} rate limited by Slack; retrying in {retry_after}s")
+            await asyncio.sleep(retry_after)
+            return await say(**kwargs)
+    
+    async def _call_agent(self, message: str, user: str, channel: str, thread_ts: str) -> str:
         """Call the agent endpoint with the message"""
+        # The agent answers in context, so never share answers across users, channels or threads
+        cache_key = (self.agent_url, user, channel, thread_ts, message.strip().lower())
+        if self._response_cache is not None:
+            with self._cache_lock:
+                cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         try:
             payload = {
                 "message": message,
@@ -104,46 +301,60 @@ class BotInstance:
                 "bot_id": self.bot_id
             }
             
-            response = requests.post(
-                self.agent_url,
-                json=payload,
-                timeout=30,
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
+            if self.batcher:
+                data = await asyncio.wait_for(
+                    asyncio.wrap_future(self.batcher.submit(payload)), timeout=30
+                )
+            else:
+                # orjson encodes in C; the client already sends the JSON content type
+                response = await self._http.post(self.agent_url, content=orjson.dumps(payload))
+                response.raise_for_status()
+                data = response.json()
             
-            data = response.json()
-            return data.get("response") or data.get("message") or data.get("text", "")
+            result = data.get("response") or data.get("message") or data.get("text", "")
+            
+            if result and self._response_cache is not None and not (
+                self._cache_skip_re and self._cache_skip_re.search(result)
+            ):
+                with self._cache_lock:
+                    self._response_cache[cache_key] = result
+            
+            return result
         
         except Exception as e:
             logger.error(f"Agent call failed for bot {self.bot_id}: {e}")
             raise
     
+    async def _start_async(self):
+        """Build the Slack app and connect its websocket; runs on the factory loop"""
+        from slack_bolt.async_app import AsyncApp
+        from slack_bolt.adapter.socket_mode.aiohttp import AsyncSocketModeHandler
+        
+        self.app = AsyncApp(
+            token=self.bot_token,
+            signing_secret=self.signing_secret
+        )
+        
+        # Resolve bot user ID once, outside the message hot path
+        self.bot_user_id = (await self.app.client.auth_test())["user_id"]
+        self._mention_re = re.compile(rf"<@{re.escape(self.bot_user_id)}>")
+        
+        # Setup handlers
+        self._setup_handlers()
+        
+        self.handler = AsyncSocketModeHandler(self.app, self.app_token, loop=self._loop)
+        await self.handler.connect_async()
+    
     def start(self):
-        """Start the bot in a separate thread"""
+        """Start the bot on the shared event loop (no thread per bot)"""
         if self.running:
             logger.warning(f"Bot {self.bot_id} is already running")
             return
         
         try:
-            # Initialize Slack app
-            self.app = App(
-                token=self.bot_token,
-                signing_secret=self.signing_secret
-            )
-            
-            # Setup handlers
-            self._setup_handlers()
-            
-            # Start in separate thread
-            def run_bot():
-                self.handler = SocketModeHandler(self.app, self.app_token)
-                self.running = True
-                logger.info(f"✅ Bot {self.bot_id} started")
-                self.handler.start()
-            
-            self.thread = threading.Thread(target=run_bot, daemon=True)
-            self.thread.start()
+            self._run(self._start_async())
+            self.running = True
+            logger.info(f"✅ Bot {self.bot_id} started")
             
             return True
         
@@ -159,7 +370,7 @@ class BotInstance:
         
         try:
             if self.handler:
-                self.handler.close()
+                self._run(self.handler.close_async())
             self.running = False
             logger.info(f"Bot {self.bot_id} stopped")
         except Exception as e:
@@ -171,6 +382,21 @@ class BotFactory:
     
     def __init__(self, persist: bool = True):
         self.bots: Dict[str, BotInstance] = {}
+        
+        # Single event loop shared by every bot's Socket Mode connection
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        self._http = asyncio.run_coroutine_threadsafe(self._create_http(), self._loop).result()
+        
+        self._batchers: Dict[str, AgentBatcher] = {}
+        self._batchers_lock = threading.Lock()
+        
+        # Cached list_bots() view; reset on any create/delete/start/stop
+        self._list_cache: Optional[Dict[str, dict]] = None
+        self._list_cache_json: Optional[bytes] = None
+        self._list_lock = threading.Lock()
+        
         self.persist = persist
         if persist:
             from bot_storage import BotStorage
@@ -206,10 +432,14 @@ class BotFactory:
             app_token=app_token,
             signing_secret=signing_secret,
             agent_url=agent_url,
-            channel_id=channel_id
+            channel_id=channel_id,
+            loop=self._loop,
+            http_client=self._http,
+            batcher=self._get_batcher(agent_url) if BATCH_ENABLED else None
         )
         
         self.bots[bot_id] = bot
+        self._invalidate_list_cache()
         
         # Persist to storage if enabled
         if self.persist:
@@ -226,25 +456,61 @@ class BotFactory:
         
         return bot_id
     
+    async def _create_http(self) -> httpx.AsyncClient:
+        """Create the shared agent HTTP client; must run on the factory loop"""
+        # HTTP/2 lets concurrent bot messages multiplex over one connection per agent host
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+            timeout=httpx.Timeout(30.0, connect=3.05),
+            headers={"Content-Type": "application/json"}
+        )
+    
+    def _get_batcher(self, agent_url: str) -> AgentBatcher:
+        """Get or create the shared batcher for an agent URL"""
+        with self._batchers_lock:
+            batcher = self._batchers.get(agent_url)
+            if batcher is None:
+                batcher = AgentBatcher(agent_url)
+                self._batchers[agent_url] = batcher
+            return batcher
+    
+    def _release_batcher(self, agent_url: str):
+        """Close an agent URL's batcher once no bot uses that URL any more"""
+        if any(bot.agent_url == agent_url for bot in self.bots.values()):
+            return
+        with self._batchers_lock:
+            batcher = self._batchers.pop(agent_url, None)
+        if batcher:
+            batcher.close()
+    
     def start_bot(self, bot_id: str):
         """Start a specific bot"""
         if bot_id not in self.bots:
             raise ValueError(f"Bot {bot_id} not found")
         
-        self.bots[bot_id].start()
+        try:
+            self.bots[bot_id].start()
+        finally:
+            self._invalidate_list_cache()
     
     def stop_bot(self, bot_id: str):
         """Stop a specific bot"""
         if bot_id not in self.bots:
             raise ValueError(f"Bot {bot_id} not found")
         
-        self.bots[bot_id].stop()
+        try:
+            self.bots[bot_id].stop()
+        finally:
+            self._invalidate_list_cache()
     
     def delete_bot(self, bot_id: str):
         """Delete a bot instance"""
         if bot_id in self.bots:
             self.stop_bot(bot_id)
-            del self.bots[bot_id]
+            agent_url = self.bots.pop(bot_id).agent_url
+            self._invalidate_list_cache()
+            self._release_batcher(agent_url)
             
             # Remove from storage if enabled
             if self.persist:
@@ -252,29 +518,72 @@ class BotFactory:
             
             logger.info(f"Deleted bot {bot_id}")
     
-    def list_bots(self) -> Dict[str, dict]:
-        """List all bots and their status"""
-        return {
-            bot_id: {
-                "agent_url": bot.agent_url,
-                "channel_id": bot.channel_id,
-                "running": bot.running
+    def _invalidate_list_cache(self):
+        with self._list_lock:
+            self._list_cache = None
+            self._list_cache_json = None
+    
+    def _cached_list(self) -> Dict[str, dict]:
+        # Caller must hold self._list_lock
+        if self._list_cache is None:
+            self._list_cache = {
+                bot_id: {
+                    "agent_url": bot.agent_url,
+                    "channel_id": bot.channel_id,
+                    "running": bot.running
+                }
+                for bot_id, bot in self.bots.items()
             }
-            for bot_id, bot in self.bots.items()
-        }
+        return self._list_cache
+    
+    def list_bots(self) -> Dict[str, dict]:
+        """List all bots and their status (cached until the next mutation)"""
+        with self._list_lock:
+            # Copy so callers can't mutate the shared cached view
+            return {bot_id: dict(info) for bot_id, info in self._cached_list().items()}
+    
+    def list_bots_json(self) -> bytes:
+        """Pre-serialized {"bots": ..., "count": ...} body for the list endpoint"""
+        with self._list_lock:
+            if self._list_cache_json is None:
+                bots = self._cached_list()
+                self._list_cache_json = orjson.dumps({"bots": bots, "count": len(bots)})
+            return self._list_cache_json
+    
+    def _for_all(self, action, verb: str):
+        """Run a per-bot action concurrently so Slack handshakes overlap"""
+        bot_ids = list(self.bots)
+        if not bot_ids:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(32, len(bot_ids))) as executor:
+            futures = {executor.submit(action, bot_id): bot_id for bot_id in bot_ids}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Failed to {verb} bot {futures[future]}: {e}")
     
     def start_all(self):
         """Start all bots"""
-        for bot_id in self.bots:
-            try:
-                self.start_bot(bot_id)
-            except Exception as e:
-                logger.error(f"Failed to start bot {bot_id}: {e}")
+        self._for_all(self.start_bot, "start")
     
     def stop_all(self):
         """Stop all bots"""
-        for bot_id in self.bots:
-            try:
-                self.stop_bot(bot_id)
-            except Exception as e:
-                logger.error(f"Failed to stop bot {bot_id}: {e}")
\ No newline at end of file
+        self._for_all(self.stop_bot, "stop")
+    
+    def shutdown(self):
+        """Stop all bots and release batchers, the HTTP client and the event loop"""
+        self.stop_all()
+        
+        with self._batchers_lock:
+            batchers = list(self._batchers.values())
+            self._batchers.clear()
+        for batcher in batchers:
+            batcher.close()
+        
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5)
+        logger.info("Bot Factory shut down")
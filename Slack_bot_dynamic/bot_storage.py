@@ -2,19 +2,29 @@
 Bot configuration storage
 Persists bot configurations to disk for restart capability
 """
-import json
+import atexit
 import os
+import threading
 from typing import Dict, Optional, List
 
+import orjson
+
 STORAGE_FILE = "bots_config.json"
+# Debounce window for coalescing writes during bursts of mutations
+FLUSH_DELAY = 0.5
 
 
 class BotStorage:
     """Persistent storage for bot configurations"""
     
-    def __init__(self, storage_file: str = STORAGE_FILE):
+    def __init__(self, storage_file: str = STORAGE_FILE, flush_delay: float = FLUSH_DELAY):
         self.storage_file = storage_file
+        self.flush_delay = flush_delay
         self.configs: Dict[str, dict] = self._load()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
     
     def _load(self) -> Dict[str, dict]:
         """Load bot configurations from disk"""
@@ -22,20 +32,45 @@ class BotStorage:
             return {}
         
         try:
-            with open(self.storage_file, 'r') as f:
-                return json.load(f)
+            with open(self.storage_file, 'rb') as f:
+                return orjson.loads(f.read())
         except Exception as e:
             print(f"Error loading bot configs: {e}")
             return {}
     
     def _save(self):
-        """Save bot configurations to disk"""
+        """Atomically and durably save bot configurations to disk"""
+        tmp_file = self.storage_file + ".tmp"
         try:
-            with open(self.storage_file, 'w') as f:
-                json.dump(self.configs, f, indent=2)
+            with open(tmp_file, 'wb') as f:
+                f.write(orjson.dumps(self.configs, option=orjson.OPT_INDENT_2))
+                # Ensure data is on disk before the rename makes it visible
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.storage_file)
         except Exception as e:
             print(f"Error saving bot configs: {e}")
     
+    def _schedule_save(self):
+        """Mark configs dirty and schedule a debounced flush"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        """Write pending changes to disk immediately"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._save()
+    
     def save_bot(self, bot_id: str, bot_token: str, app_token: str,
                  signing_secret: str, agent_url: str, channel_id: Optional[str] = None):
         """Save a bot configuration"""
@@ -46,7 +81,7 @@ class BotStorage:
             "agent_url": agent_url,
             "channel_id": channel_id
         }
-        self._save()
+        self._schedule_save()
     
     def get_bot(self, bot_id: str) -> Optional[dict]:
         """Get a bot configuration"""
@@ -56,7 +91,7 @@ class BotStorage:
         """Delete a bot configuration"""
         if bot_id in self.configs:
             del self.configs[bot_id]
-            self._save()
+            self._schedule_save()
     
     def list_bots(self) -> List[str]:
         """List all bot IDs"""
@@ -0,0 +1,16 @@
+"""
+orjson-backed JSON provider for Flask
+Replaces the stdlib json encoder used by jsonify and request.get_json
+"""
+import orjson
+from flask.json.provider import JSONProvider
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider that serializes with orjson"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
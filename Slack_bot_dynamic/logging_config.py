@@ -0,0 +1,31 @@
+"""
+Logging setup for the Bot Factory Service
+Handlers run on a background listener thread so callers only enqueue records
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+
+_listener = None
+
+
+def configure_logging(level: int = logging.INFO):
+    """Route root logging through a QueueHandler drained by a QueueListener (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
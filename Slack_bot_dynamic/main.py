@@ -7,14 +7,16 @@ import sys
 import logging
 from bot_factory import BotFactory
 from bot_storage import BotStorage
+from logging_config import configure_logging
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
 def run_api_server():
     """Run the REST API server"""
     from api_service import app
+    from waitress import serve
     
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('DEBUG', 'false').lower() == 'true'
@@ -30,7 +32,9 @@ def run_api_server():
     logger.info("  POST   /bots/start-all    - Start all bots")
     logger.info("  POST   /bots/stop-all     - Stop all bots")
     
-    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
+    app.debug = debug
+    # Threaded server without gevent patching: the bot factory's asyncio loop needs a real OS thread
+    serve(app, host='0.0.0.0', port=port, threads=32)
 
 
 def run_from_config():
@@ -71,7 +75,7 @@ def run_from_config():
             time.sleep(1)
     except KeyboardInterrupt:
         logger.info("Stopping all bots...")
-        factory.stop_all()
+        factory.shutdown()
 
 
 def main():
@@ -2,15 +2,17 @@
 Simple test agent endpoint
 Mock LLM agent for testing the bot factory
 """
+from gevent import monkey
+monkey.patch_all()
+
 from flask import Flask, request, jsonify
+from json_provider import ORJSONProvider
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
-@app.route('/chat', methods=['POST'])
-def chat():
-    """Mock agent endpoint that echoes back messages"""
-    data = request.get_json()
-    
+def _echo(data):
+    """Build an echo response for a single payload"""
     message = data.get('message', '')
     user_id = data.get('user_id', 'unknown')
     bot_id = data.get('bot_id', 'unknown')
@@ -18,15 +20,28 @@ def chat():
     # Simple echo response
     response = f"[{bot_id}] Echo: {message}"
     
-    return jsonify({
+    return {
         "response": response,
         "metadata": {
             "user_id": user_id,
             "bot_id": bot_id
         }
-    })
+    }
+
+@app.route('/chat', methods=['POST'])
+def chat():
+    """Mock agent endpoint that echoes back messages"""
+    data = request.get_json()
+    
+    # Batched payloads from the bot factory (BATCH_ENABLED=true)
+    if 'batch' in data:
+        return jsonify({"batch": [_echo(payload) for payload in data['batch']]})
+    
+    return jsonify(_echo(data))
 
 if __name__ == '__main__':
+    from gevent.pywsgi import WSGIServer
     print("🧪 Starting test agent on port 8000")
     print("This is a mock agent endpoint for testing")
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    app.debug = True
+    WSGIServer(('0.0.0.0', 8000), app).serve_forever()
\ No newline at end of file
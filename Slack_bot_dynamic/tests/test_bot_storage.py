@@ -0,0 +1,56 @@
+import time
+
+import orjson
+
+from bot_storage import BotStorage
+
+
+def _storage(tmp_path, flush_delay=10.0):
+    return BotStorage(storage_file=str(tmp_path / "bots.json"), flush_delay=flush_delay)
+
+
+def _save(storage, bot_id):
+    storage.save_bot(bot_id, "xoxb", "xapp", "secret", "http://agent", channel_id=None)
+
+
+def test_writes_are_debounced_until_flush(tmp_path):
+    storage = _storage(tmp_path)
+    _save(storage, "a")
+    _save(storage, "b")
+
+    assert not (tmp_path / "bots.json").exists()
+
+    storage.flush()
+
+    assert set(orjson.loads((tmp_path / "bots.json").read_bytes())) == {"a", "b"}
+    assert not (tmp_path / "bots.json.tmp").exists()
+
+
+def test_timer_flushes_after_delay(tmp_path):
+    storage = _storage(tmp_path, flush_delay=0.05)
+    _save(storage, "a")
+
+    deadline = time.monotonic() + 2
+    while not (tmp_path / "bots.json").exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert set(orjson.loads((tmp_path / "bots.json").read_bytes())) == {"a"}
+
+
+def test_delete_and_reload(tmp_path):
+    storage = _storage(tmp_path)
+    _save(storage, "a")
+    _save(storage, "b")
+    storage.delete_bot("a")
+    storage.flush()
+
+    reloaded = _storage(tmp_path)
+
+    assert reloaded.list_bots() == ["b"]
+    assert reloaded.get_bot("b")["agent_url"] == "http://agent"
+
+
+def test_flush_without_changes_does_not_write(tmp_path):
+    _storage(tmp_path).flush()
+
+    assert not (tmp_path / "bots.json").exists()
@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+from bot_factory import TokenBucket
+
+
+def _acquire_times(bucket: TokenBucket, count: int) -> list:
+    async def run():
+        start = time.monotonic()
+        times = []
+
+        async def send():
+            await bucket.acquire()
+            times.append(time.monotonic() - start)
+
+        await asyncio.gather(*(send() for _ in range(count)))
+        return times
+
+    return asyncio.run(run())
+
+
+def test_burst_is_served_immediately():
+    times = _acquire_times(TokenBucket(rate=1.0, capacity=5), 5)
+
+    assert max(times) < 0.05
+
+
+def test_overflow_is_queued_and_paced_not_dropped():
+    rate = 20.0
+    times = _acquire_times(TokenBucket(rate=rate, capacity=2), 8)
+
+    assert len(times) == 8
+    assert times == sorted(times)
+    # The 6 messages past the burst each wait for a fresh token
+    assert times[-1] >= 6 / rate - 0.02
+    overflow_gaps = [later - earlier for earlier, later in zip(times[2:], times[3:])]
+    assert min(overflow_gaps) >= 1 / rate - 0.02
@@ -1,8 +1,31 @@
 """NVIDIA DataMesh library."""
 
-from .pipeline import DataMeshPipeline
-from .llm_preparation import LLMDataExportConfig, export_llm_ready_dataset
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .llm_preparation import LLMDataExportConfig, export_llm_ready_dataset
+    from .pipeline import DataMeshPipeline
+
+# Resolved lazily so that e.g. ``nvidia_datamesh.config`` can be imported without Daft.
+_LAZY_ATTRS = {
+    "DataMeshPipeline": ".pipeline",
+    "LLMDataExportConfig": ".llm_preparation",
+    "export_llm_ready_dataset": ".llm_preparation",
+}
 
 __all__ = ["DataMeshPipeline", "LLMDataExportConfig", "export_llm_ready_dataset"]
 
 __version__ = "1.0.0"
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, PrivateAttr, model_validator, validator
 
 
 class DataSourceConfig(BaseModel):
@@ -13,7 +13,7 @@ class DataSourceConfig(BaseModel):
 
     name: str
     type: str
-    params: Dict[str, str] = Field(default_factory=dict)
+    params: Dict[str, Any] = Field(default_factory=dict)
 
     @validator("name")
     def name_not_empty(cls, value: str) -> str:
@@ -59,8 +59,18 @@ class PipelineConfig(BaseModel):
     schema: SchemaConfig
     io: PipelineIOConfig = Field(default_factory=PipelineIOConfig)
 
-    def get_source(self, name: str) -> DataSourceConfig:
+    _by_name: Dict[str, DataSourceConfig] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def index_sources(self) -> "PipelineConfig":
+        # First source wins on duplicate names, matching the previous linear scan
+        self._by_name = {}
         for source in self.sources:
-            if source.name == name:
-                return source
-        raise KeyError(f"Unknown source '{name}'")
+            self._by_name.setdefault(source.name, source)
+        return self
+
+    def get_source(self, name: str) -> DataSourceConfig:
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise KeyError(f"Unknown source '{name}'") from None
@@ -0,0 +1,20 @@
+"""Mapping from configuration dtype names to Daft data types."""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import daft
+
+DAFT_TYPE_MAP: Dict[str, daft.DataType] = {
+    "string": daft.DataType.string(),
+    "int": daft.DataType.int64(),
+    "float": daft.DataType.float64(),
+    "bool": daft.DataType.bool(),
+}
+
+
+def to_daft_dtype(dtype: str) -> daft.DataType:
+    """Return the Daft type for a config dtype name, defaulting to string."""
+
+    return DAFT_TYPE_MAP.get(dtype, daft.DataType.string())
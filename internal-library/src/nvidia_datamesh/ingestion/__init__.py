@@ -1,11 +1,34 @@
 """Ingestion adapters for NVIDIA DataMesh."""
 
-from .base_source import BaseIngestionSource
-from .csv_source import CSVIngestionSource
-from .api_source import APIIngestionSource
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .api_source import APIIngestionSource
+    from .base_source import BaseIngestionSource
+    from .csv_source import CSVIngestionSource
+
+# Adapters pull in Daft, so they are resolved lazily on first access (PEP 562).
+_LAZY_ATTRS = {
+    "BaseIngestionSource": ".base_source",
+    "CSVIngestionSource": ".csv_source",
+    "APIIngestionSource": ".api_source",
+}
 
 __all__ = [
     "BaseIngestionSource",
     "CSVIngestionSource",
     "APIIngestionSource",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import Any, Dict, Iterable, List
 
 import daft
-import requests
+import httpx
+import pyarrow as pa
 
 from .base_source import BaseIngestionSource
 
@@ -22,26 +24,40 @@ class APIIngestionSource(BaseIngestionSource):
         self.max_pages = int(params.get("max_pages", 10))
 
     def to_daft_dataframe(self) -> daft.DataFrame:
-        records: List[Dict[str, Any]] = []
+        tables: List[pa.Table] = []
         for payload in self._paginate():
             if isinstance(payload, dict):
-                records.append(payload)
-            elif isinstance(payload, list):
-                records.extend(payload)
-            else:
+                payload = [payload]
+            elif not isinstance(payload, list):
                 raise ValueError("API responses must be list or dict of JSON objects")
-        return daft.from_pylist(records)
+            tables.append(pa.Table.from_pylist(payload))
+        if not tables:
+            return daft.from_pylist([])
+        return daft.from_arrow(pa.concat_tables(tables, promote_options="permissive"))
 
     def _paginate(self) -> Iterable[Any]:
-        for page in range(1, self.max_pages + 1):
-            response = requests.get(
-                self.endpoint,
-                headers=self.headers,
-                params={self.batch_param: page, "page_size": self.page_size},
-                timeout=30,
+        return asyncio.run(self._paginate_async())
+
+    async def _paginate_async(self) -> List[Any]:
+        """Fetch pages 1..max_pages concurrently and keep those before the first empty page."""
+        async with httpx.AsyncClient(http2=True, headers=self.headers, timeout=30) as client:
+            # Pages past the last real one are speculative, so their failures must not
+            # abort the ingest; errors are only raised for pages that are actually used
+            responses = await asyncio.gather(
+                *(
+                    client.get(self.endpoint, params={self.batch_param: page, "page_size": self.page_size})
+                    for page in range(1, self.max_pages + 1)
+                ),
+                return_exceptions=True,
             )
+
+        payloads: List[Any] = []
+        for response in responses:
+            if isinstance(response, BaseException):
+                raise response
             response.raise_for_status()
             payload = response.json()
             if not payload:
                 break
-            yield payload
+            payloads.append(payload)
+        return payloads
@@ -2,16 +2,18 @@
 
 from __future__ import annotations
 
-from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import daft
 
+from ..dtypes import to_daft_dtype
 from .base_source import BaseIngestionSource
 
+_READ_BUFFER_SIZE = 8 * 1024 * 1024
+
 
 class CSVIngestionSource(BaseIngestionSource):
-    """Create a Daft DataFrame from CSV or JSONL files."""
+    """Create a Daft DataFrame from CSV or JSONL files (local paths, URIs, or globs)."""
 
     def __init__(
         self,
@@ -19,17 +21,26 @@ class CSVIngestionSource(BaseIngestionSource):
         params: Dict[str, Any],
     ) -> None:
         super().__init__(name, params)
-        self.path = Path(params.get("path", ""))
+        self.path = str(params.get("path", ""))
         self.format = params.get("format", "csv")
         self.columns: Optional[List[str]] = params.get("columns")
+        # Explicit dtypes (column -> "string"/"int"/"float"/"bool") skip Daft's sampling pass
+        self.schema_hints: Dict[str, daft.DataType] = {
+            column: to_daft_dtype(dtype)
+            for column, dtype in (params.get("schema_hints") or {}).items()
+        }
 
     def to_daft_dataframe(self) -> daft.DataFrame:
-        if not self.path.exists():
-            raise FileNotFoundError(f"{self.path} was not found for source {self.name}")
+        read_kwargs: Dict[str, Any] = {"_buffer_size": _READ_BUFFER_SIZE}
+        if self.schema_hints:
+            read_kwargs.update(schema=self.schema_hints, infer_schema=False)
+
         if self.format == "csv":
-            df = daft.read_csv(str(self.path), columns=self.columns)
+            df = daft.read_csv(self.path, **read_kwargs)
         elif self.format == "jsonl":
-            df = daft.read_json(str(self.path))
+            df = daft.read_json(self.path, **read_kwargs)
         else:
             raise ValueError("CSVIngestionSource supports only 'csv' or 'jsonl'")
+        if self.columns:
+            df = df.select(*self.columns)
         return df
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import string
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, List, Optional, Tuple
 
 import daft
 
@@ -21,6 +22,66 @@ class LLMDataExportConfig:
     prompt_template: str = "{text}"
 
 
+def _parse_template(template: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+    """Split a template into (literal, field) parts, or None if it needs ``str.format``."""
+
+    parts = []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return None
+        parts.append((literal, field))
+    return parts
+
+
+def _prompt_expression(export_config: LLMDataExportConfig) -> daft.Expression:
+    """Build the prompt column as a native Daft string expression."""
+
+    def _column(field: str) -> daft.Expression:
+        name = export_config.text_column if field == "text" else field
+        return daft.col(name).cast(daft.DataType.string()).fill_null("")
+
+    parts = _parse_template(export_config.prompt_template)
+    if parts is None:
+        return _format_prompt_udf(export_config)
+
+    expr = daft.lit("")
+    for literal, field in parts:
+        if literal:
+            expr = expr + daft.lit(literal)
+        if field is not None:
+            expr = expr + _column(field)
+    return expr
+
+
+def _as_daft_string(value: Any) -> Any:
+    """Render nulls and bools like Daft's string cast so both prompt paths agree."""
+
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _format_prompt_udf(export_config: LLMDataExportConfig) -> daft.Expression:
+    """Row-wise fallback for templates with format specs, conversions, or indexing."""
+
+    metadata_columns = export_config.metadata_columns or []
+
+    @daft.udf(return_dtype=daft.DataType.string())
+    def _format(text: daft.Series, *metadata: daft.Series) -> List[str]:
+        rows = zip(text.to_pylist(), *(series.to_pylist() for series in metadata))
+        return [
+            export_config.prompt_template.format(
+                text=_as_daft_string(values[0]),
+                **{col: _as_daft_string(value) for col, value in zip(metadata_columns, values[1:])},
+            )
+            for values in rows
+        ]
+
+    return _format(daft.col(export_config.text_column), *(daft.col(col) for col in metadata_columns))
+
+
 def export_llm_ready_dataset(
     pipeline: DataMeshPipeline,
     export_config: LLMDataExportConfig,
@@ -32,12 +93,7 @@ def export_llm_ready_dataset(
     if export_config.max_records:
         df = df.limit(export_config.max_records)
 
-    def _format_prompt(row: Dict[str, str]) -> str:
-        text = row.get(export_config.text_column, "")
-        metadata = {col: row.get(col) for col in (export_config.metadata_columns or [])}
-        return export_config.prompt_template.format(text=text, **metadata)
-
-    df = df.with_column("prompt", daft.udf(lambda row: _format_prompt(row))(daft.col("__row__")))
+    df = df.with_column("prompt", _prompt_expression(export_config))
     result_path = output_path or pipeline.workspace_dir / "llm_dataset.jsonl"
     df.select(["prompt"]).write_json(str(result_path))
     return result_path
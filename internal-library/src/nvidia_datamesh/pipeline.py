@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List
 
 import daft
 
@@ -26,7 +26,7 @@ class DataMeshPipeline:
         self.workspace_dir = Path(config.io.workspace_dir)
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
 
-    def _create_source(self, type_name: str, name: str, params: Dict[str, str]) -> BaseIngestionSource:
+    def _create_source(self, type_name: str, name: str, params: Dict[str, Any]) -> BaseIngestionSource:
         try:
             source_cls = _SOURCE_REGISTRY[type_name]
         except KeyError as exc:  # pragma: no cover - configuration errors
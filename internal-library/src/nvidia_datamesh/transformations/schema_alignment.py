@@ -2,27 +2,22 @@
 
 from __future__ import annotations
 
-from typing import Dict
-
 import daft
 
 from ..config import SchemaConfig
-
-
-_DAFT_TYPE_MAP: Dict[str, daft.DataType] = {
-    "string": daft.DataType.string(),
-    "int": daft.DataType.int64(),
-    "float": daft.DataType.float64(),
-    "bool": daft.DataType.bool(),
-}
+from ..dtypes import to_daft_dtype
 
 
 def align_schema(df: daft.DataFrame, schema: SchemaConfig) -> daft.DataFrame:
-    """Rename and cast columns according to the schema definition."""
+    """Rename and cast columns according to the schema definition in a single projection."""
 
+    existing = df.schema().column_names()
+    exprs = []
     for field in schema.fields:
-        if field.source not in df.column_names():
-            df = df.with_column(field.source, daft.lit(None))
-        df = df.rename({field.source: field.target})
-        df = df.cast({field.target: _DAFT_TYPE_MAP.get(field.dtype, daft.DataType.string())})
-    return df
+        source = daft.col(field.source) if field.source in existing else daft.lit(None)
+        exprs.append(source.cast(to_daft_dtype(field.dtype)).alias(field.target))
+
+    # Columns not mentioned by the schema pass through unchanged
+    mapped = {field.source for field in schema.fields} | {field.target for field in schema.fields}
+    exprs.extend(daft.col(name) for name in existing if name not in mapped)
+    return df.select(*exprs)
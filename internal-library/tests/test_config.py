@@ -0,0 +1,24 @@
+import pytest
+
+from nvidia_datamesh.config import PipelineConfig
+
+
+def _config(*sources):
+    return PipelineConfig(sources=list(sources), schema={"fields": []})
+
+
+def test_get_source_by_name():
+    config = _config({"name": "a", "type": "csv"}, {"name": "b", "type": "rest"})
+
+    assert config.get_source("b").type == "rest"
+
+
+def test_get_source_first_wins_on_duplicate_names():
+    config = _config({"name": "a", "type": "csv"}, {"name": "a", "type": "rest"})
+
+    assert config.get_source("a").type == "csv"
+
+
+def test_get_source_unknown_name_raises():
+    with pytest.raises(KeyError, match="Unknown source 'missing'"):
+        _config({"name": "a", "type": "csv"}).get_source("missing")
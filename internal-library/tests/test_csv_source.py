@@ -0,0 +1,33 @@
+import daft
+
+from nvidia_datamesh.ingestion.csv_source import CSVIngestionSource
+
+
+def test_schema_hints_map_to_daft_types():
+    source = CSVIngestionSource("s", {"path": "x.csv", "schema_hints": {"id": "int", "name": "string", "x": "unknown"}})
+
+    assert source.schema_hints == {
+        "id": daft.DataType.int64(),
+        "name": daft.DataType.string(),
+        "x": daft.DataType.string(),
+    }
+
+
+def test_csv_read_uses_schema_hints(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id,score\n1,2.5\n2,3.0\n")
+    source = CSVIngestionSource("s", {"path": str(path), "schema_hints": {"id": "string", "score": "float"}})
+
+    df = source.to_daft_dataframe()
+
+    assert df.schema()["id"].dtype == daft.DataType.string()
+    assert df.to_pydict() == {"id": ["1", "2"], "score": [2.5, 3.0]}
+
+
+def test_csv_read_without_hints_infers_schema(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("id\n1\n")
+
+    df = CSVIngestionSource("s", {"path": str(path)}).to_daft_dataframe()
+
+    assert df.schema()["id"].dtype == daft.DataType.int64()
@@ -0,0 +1,60 @@
+import daft
+
+from nvidia_datamesh.llm_preparation import LLMDataExportConfig, _parse_template, _prompt_expression
+
+
+def _prompts(df: daft.DataFrame, config: LLMDataExportConfig) -> list:
+    return df.select(_prompt_expression(config).alias("prompt")).to_pydict()["prompt"]
+
+
+def test_parse_template_splits_literals_and_fields():
+    assert _parse_template("Text: {text}\nMeta: {source}") == [("Text: ", "text"), ("\nMeta: ", "source")]
+
+
+def test_parse_template_unescapes_braces():
+    parts = _parse_template("{{literal}} {text}")
+    assert "".join(literal for literal, _ in parts) == "{literal} "
+    assert [field for _, field in parts if field] == ["text"]
+
+
+def test_parse_template_rejects_specs_conversions_and_indexing():
+    assert _parse_template("{text:>10}") is None
+    assert _parse_template("{text!r}") is None
+    assert _parse_template("{meta[0]}") is None
+    assert _parse_template("{}") is None
+
+
+def test_prompt_expression_substitutes_columns():
+    df = daft.from_pydict({"body": ["a", "b"], "source": ["x", "y"], "n": [1, 2]})
+    config = LLMDataExportConfig(
+        text_column="body",
+        metadata_columns=["source", "n"],
+        prompt_template="Text: {text}\nMeta: {source} #{n}",
+    )
+    assert _prompts(df, config) == ["Text: a\nMeta: x #1", "Text: b\nMeta: y #2"]
+
+
+def test_prompt_expression_keeps_escaped_braces():
+    df = daft.from_pydict({"body": ["a"]})
+    config = LLMDataExportConfig(text_column="body", prompt_template="{{json}}: {text}")
+    assert _prompts(df, config) == ["{json}: a"]
+
+
+def test_prompt_expression_renders_nulls_as_empty():
+    df = daft.from_pydict({"body": [None]})
+    config = LLMDataExportConfig(text_column="body", prompt_template="[{text}]")
+    assert _prompts(df, config) == ["[]"]
+
+
+def test_prompt_expression_falls_back_to_str_format():
+    df = daft.from_pydict({"body": ["a"], "n": [7]})
+    config = LLMDataExportConfig(text_column="body", metadata_columns=["n"], prompt_template="{text!r} {n:03d}")
+    assert _prompts(df, config) == ["'a' 007"]
+
+
+def test_fallback_renders_nulls_and_bools_like_native_path():
+    df = daft.from_pydict({"body": [None, "a"], "flag": [True, None]})
+    native = LLMDataExportConfig(text_column="body", metadata_columns=["flag"], prompt_template="{text}|{flag}")
+    fallback = LLMDataExportConfig(text_column="body", metadata_columns=["flag"], prompt_template="{text:s}|{flag:s}")
+
+    assert _prompts(df, native) == _prompts(df, fallback) == ["|true", "a|"]
@@ -0,0 +1,28 @@
+import daft
+
+from nvidia_datamesh.config import SchemaConfig
+from nvidia_datamesh.transformations import align_schema
+
+
+def test_align_schema_renames_casts_and_fills_missing():
+    df = daft.from_pydict({"a": ["1", "2"], "b": ["x", "y"]})
+    schema = SchemaConfig(
+        fields=[
+            {"source": "a", "target": "id", "dtype": "int"},
+            {"source": "missing", "target": "score", "dtype": "float"},
+            {"source": "b", "target": "name"},
+        ]
+    )
+
+    result = align_schema(df, schema)
+
+    assert result.schema().column_names() == ["id", "score", "name"]
+    assert result.schema()["score"].dtype == daft.DataType.float64()
+    assert result.to_pydict() == {"id": [1, 2], "score": [None, None], "name": ["x", "y"]}
+
+
+def test_align_schema_passes_through_unmapped_columns():
+    df = daft.from_pydict({"a": ["1"], "extra": [True]})
+    schema = SchemaConfig(fields=[{"source": "a", "target": "id"}])
+
+    assert align_schema(df, schema).to_pydict() == {"id": ["1"], "extra": [True]}
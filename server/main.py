@@ -2,13 +2,23 @@ from __future__ import annotations
 
 import os
 import uuid
+import asyncio
+import sqlite3
+import functools
+import importlib.util
+import threading
+import time
 import traceback
+from array import array
 from typing import Dict, Any, Optional, List
 
+import httpx
+import orjson
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 # LLMs
@@ -18,12 +28,16 @@ from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END
 
 # --- NEW: Local Storage Imports ---
-from tinydb import TinyDB, Query
+import chromadb
 from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.documents import Document as LangChainDocument
 
+# --- NEW: LLM response cache ---
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
+
 
 # --------------------------- Config ---------------------------
 # --- REMOVED: All ASTRA_DB_... variables ---
@@ -37,10 +51,62 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
 
+# LLM response cache (keyed on prompt + LLM params)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".langchain_cache.db")
+
 # --- MODIFIED: Collection names ---
-DOCUMENTS_COLLECTION = "documents" # This will be a Chroma collection
-TEAMS_COLLECTION = "teams"       # This will be a TinyDB table
-AGENTS_COLLECTION = "agents"     # This will be a TinyDB table
+DOCUMENTS_COLLECTION = "docs"     # Chroma collection prefix: one "docs_{team_id}" per team
+ANSWER_CACHE_COLLECTION = "answer_cache" # Chroma collection of (query vector -> answer)
+TEAMS_COLLECTION = "teams"       # This will be a SQLite table
+AGENTS_COLLECTION = "agents"     # This will be a SQLite table
+ANSWER_EXACT_TABLE = "answer_exact" # SQLite table of full /query results
+APP_DB_PATH = os.getenv("APP_DB_PATH", "local_app.db")
+
+# Chroma server mode: when CHROMA_HOST is set, vectors live in a separate `chroma run` process
+# so HNSW writes don't compete with request handling; otherwise Chroma runs embedded on disk
+CHROMA_HOST = os.getenv("CHROMA_HOST")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8001"))
+CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
+
+# Chroma >= 0.4 persists on write; older versions need an explicit (expensive) persist()
+CHROMA_NEEDS_PERSIST = tuple(int(p) for p in chromadb.__version__.split(".")[:2]) < (0, 4)
+CHROMA_PERSIST_INTERVAL = float(os.getenv("CHROMA_PERSIST_INTERVAL", "5"))
+
+# Minimum cosine similarity of the top hit for retrieved context to reach the LLM.
+# 0.82 matches the old 0.75 gate on l2 relevance (1 - sqrt(2) * (1 - cos)) for unit vectors.
+SIM_THRESHOLD = float(os.getenv("SIM_THRESHOLD", "0.82"))
+
+# Semantic answer cache: cosine similarity at or above the threshold is a hit; the
+# gray zone below it is only a hit if an LLM confirms both questions have the same intent
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_GRAY_ZONE = float(os.getenv("SEMANTIC_CACHE_GRAY_ZONE", "0.85"))
+
+# Exact answer cache: seconds an identical (team, agent type, query) result is served from SQLite
+ANSWER_EXACT_TTL = float(os.getenv("ANSWER_EXACT_TTL", "300"))
+
+# HNSW index params tuned for per-team KBs of a few thousand docs: a smaller graph and
+# search beam trade a little recall for much lower query latency. Only applied when a
+# collection is created; existing collections must be recreated and re-ingested.
+CHROMA_HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": int(os.getenv("CHROMA_HNSW_M", "16")),
+    "hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "100")),
+    "hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", "32")),
+}
+
+# Upper bound on records returned by /debug/vector per call
+DEBUG_VECTOR_MAX_LIMIT = int(os.getenv("DEBUG_VECTOR_MAX_LIMIT", "1000"))
+
+# Cached query embeddings (LRU entries)
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("QUERY_EMBED_CACHE_SIZE", "2048"))
+
+# Texts per embeddings request; chunks are embedded concurrently
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "512"))
+
+# Local embedding fallback: GPU when available, otherwise an int8-quantized ONNX export on CPU
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+LOCAL_EMBEDDING_ONNX_FILE = os.getenv("LOCAL_EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "64"))
 
 
 # --------------------------- Data Models -----------------------
@@ -68,62 +134,274 @@ class DocumentInput(BaseModel):
 
 # -------------------------- Local DB Setup -----------------
 
-# --- NEW: TinyDB setup for Teams and Agents ---
-db = TinyDB('local_app_db.json')
-teams_table = db.table(TEAMS_COLLECTION)
-agents_table = db.table(AGENTS_COLLECTION)
-TeamQuery = Query()
-AgentQuery = Query()
+# --- NEW: SQLite setup for Teams and Agents ---
+# Indexed lookups and single-row inserts (TinyDB scanned and rewrote the whole JSON file).
+# One shared connection; the lock serializes access across FastAPI worker threads.
+db = sqlite3.connect(APP_DB_PATH, check_same_thread=False)
+db.row_factory = sqlite3.Row
+db_lock = threading.Lock()
+
+with db_lock, db:
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        f"CREATE TABLE IF NOT EXISTS {TEAMS_COLLECTION} ("
+        "team_id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT)"
+    )
+    db.execute(
+        f"CREATE TABLE IF NOT EXISTS {AGENTS_COLLECTION} ("
+        "agent_id TEXT PRIMARY KEY, team_id TEXT NOT NULL, name TEXT NOT NULL, type TEXT NOT NULL, model TEXT)"
+    )
+    db.execute(f"CREATE INDEX IF NOT EXISTS idx_{AGENTS_COLLECTION}_team_id ON {AGENTS_COLLECTION}(team_id)")
+    db.execute(
+        f"CREATE TABLE IF NOT EXISTS {ANSWER_EXACT_TABLE} ("
+        "team_id TEXT NOT NULL, agent_type TEXT NOT NULL, query TEXT NOT NULL, answer TEXT, hits TEXT, ts REAL NOT NULL, "
+        "PRIMARY KEY (team_id, agent_type, query))"
+    )
+    db.execute(f"CREATE INDEX IF NOT EXISTS idx_{ANSWER_EXACT_TABLE}_ts ON {ANSWER_EXACT_TABLE}(ts)")
+    db.execute(f"DELETE FROM {ANSWER_EXACT_TABLE} WHERE ts <= ?", (time.time() - ANSWER_EXACT_TTL,))
+
+def db_insert_team(doc: Dict[str, Any]):
+    with db_lock, db:
+        db.execute(
+            f"INSERT OR REPLACE INTO {TEAMS_COLLECTION} (team_id, name, description) VALUES (?, ?, ?)",
+            (doc["team_id"], doc["name"], doc.get("description")),
+        )
+
+def db_get_team(team_id: str) -> Optional[Dict[str, Any]]:
+    with db_lock:
+        row = db.execute(
+            f"SELECT team_id, name, description FROM {TEAMS_COLLECTION} WHERE team_id = ?", (team_id,)
+        ).fetchone()
+    return dict(row) if row else None
+
+def db_team_exists(team_id: str) -> bool:
+    with db_lock:
+        return db.execute(f"SELECT 1 FROM {TEAMS_COLLECTION} WHERE team_id = ?", (team_id,)).fetchone() is not None
+
+def db_list_teams() -> List[Dict[str, Any]]:
+    with db_lock:
+        rows = db.execute(f"SELECT team_id, name, description FROM {TEAMS_COLLECTION} ORDER BY rowid").fetchall()
+    return [dict(row) for row in rows]
+
+def db_count_teams() -> int:
+    with db_lock:
+        return db.execute(f"SELECT COUNT(*) FROM {TEAMS_COLLECTION}").fetchone()[0]
+
+def db_insert_agent(doc: Dict[str, Any]):
+    with db_lock, db:
+        db.execute(
+            f"INSERT OR REPLACE INTO {AGENTS_COLLECTION} (agent_id, team_id, name, type, model) VALUES (?, ?, ?, ?, ?)",
+            (doc["agent_id"], doc["team_id"], doc["name"], doc["type"], doc.get("model")),
+        )
+
+def db_get_agents(team_id: str) -> List[Dict[str, Any]]:
+    with db_lock:
+        rows = db.execute(
+            f"SELECT agent_id, team_id, name, type, model FROM {AGENTS_COLLECTION} WHERE team_id = ? ORDER BY rowid",
+            (team_id,),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+def db_get_exact_answer(team_id: str, agent_type: str, query: str) -> Optional[Dict[str, Any]]:
+    with db_lock:
+        row = db.execute(
+            f"SELECT answer, hits FROM {ANSWER_EXACT_TABLE} WHERE team_id = ? AND agent_type = ? AND query = ? AND ts > ?",
+            (team_id, agent_type, query, time.time() - ANSWER_EXACT_TTL),
+        ).fetchone()
+    return {"answer": row["answer"], "hits": orjson.loads(row["hits"])} if row else None
+
+def db_put_exact_answer(team_id: str, agent_type: str, query: str, result: Dict[str, Any]):
+    now = time.time()
+    with db_lock, db:
+        # Prune expired rows so the table stays bounded by the live working set
+        db.execute(f"DELETE FROM {ANSWER_EXACT_TABLE} WHERE ts <= ?", (now - ANSWER_EXACT_TTL,))
+        db.execute(
+            f"INSERT OR REPLACE INTO {ANSWER_EXACT_TABLE} (team_id, agent_type, query, answer, hits, ts) VALUES (?, ?, ?, ?, ?, ?)",
+            (team_id, agent_type, query, result.get("answer"), orjson.dumps(result.get("hits") or []).decode(), now),
+        )
+
+def db_delete_exact_answers(team_id: str):
+    with db_lock, db:
+        db.execute(f"DELETE FROM {ANSWER_EXACT_TABLE} WHERE team_id = ?", (team_id,))
+
+# --- NEW: Shared HTTP connection pools for OpenAI (keep-alive + HTTP/2) ---
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+openai_http_client = httpx.Client(http2=True, limits=OPENAI_HTTP_LIMITS, timeout=60)
+openai_http_async_client = httpx.AsyncClient(http2=True, limits=OPENAI_HTTP_LIMITS, timeout=60)
 
 # --- NEW: ChromaDB setup for Documents (Vectors) ---
 def get_embedding_model():
     """Selects the embedding model based on config."""
     if OPENAI_API_KEY and EMBEDDING_PROVIDER == "openai":
         print(f"Using OpenAI embeddings: {EMBEDDING_MODEL}")
-        return OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=OPENAI_API_KEY)
+        return OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            api_key=OPENAI_API_KEY,
+            http_client=openai_http_client,
+            http_async_client=openai_http_async_client,
+        )
     
     # Fallback to a local model
-    local_model = "all-MiniLM-L6-v2"
-    print(f"Warning: Falling back to local embeddings: {local_model}")
+    print(f"Warning: Falling back to local embeddings: {LOCAL_EMBEDDING_MODEL}")
     return HuggingFaceEmbeddings(
-        model_name=local_model,
-        model_kwargs={'device': 'cpu'} # Or 'cuda' if available
+        model_name=LOCAL_EMBEDDING_MODEL,
+        model_kwargs=local_embedding_model_kwargs(),
+        encode_kwargs={'batch_size': LOCAL_EMBEDDING_BATCH_SIZE, 'normalize_embeddings': True}
     )
 
+def local_embedding_model_kwargs() -> Dict[str, Any]:
+    """CUDA when present; on CPU use the ONNX Runtime backend with an int8 model if installed."""
+    import torch
+
+    if torch.cuda.is_available():
+        return {'device': 'cuda'}
+    if importlib.util.find_spec("optimum") and importlib.util.find_spec("onnxruntime"):
+        print(f"Using ONNX Runtime for local embeddings: {LOCAL_EMBEDDING_ONNX_FILE}")
+        return {
+            'device': 'cpu',
+            'backend': 'onnx',
+            'model_kwargs': {'file_name': LOCAL_EMBEDDING_ONNX_FILE},
+        }
+    return {'device': 'cpu'}
+
 # Initialize embeddings
 embedding_function = get_embedding_model()
 
-# Initialize Chroma client (persistent)
-chroma_client = Chroma(
-    collection_name=DOCUMENTS_COLLECTION,
+# --- NEW: Chroma storage backend (HTTP server or embedded persistent directory) ---
+if CHROMA_HOST:
+    print(f"Using Chroma server at {CHROMA_HOST}:{CHROMA_PORT}")
+    CHROMA_STORE_KWARGS: Dict[str, Any] = {"client": chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)}
+else:
+    CHROMA_STORE_KWARGS = {"persist_directory": CHROMA_PERSIST_DIR}
+
+# --- MODIFIED: One persistent Chroma collection per team ---
+# Searches only traverse the team's own HNSW graph instead of post-filtering a shared one.
+_team_collections: Dict[str, Chroma] = {}
+_team_collections_lock = threading.Lock()
+
+def get_collection(team_id: str) -> Chroma:
+    with _team_collections_lock:
+        collection = _team_collections.get(team_id)
+        if collection is None:
+            collection = Chroma(
+                collection_name=f"{DOCUMENTS_COLLECTION}_{team_id}",
+                embedding_function=embedding_function,
+                collection_metadata=CHROMA_HNSW_METADATA,
+                **CHROMA_STORE_KWARGS
+            )
+            _team_collections[team_id] = collection
+        return collection
+
+# Semantic cache of previous answers (cosine space so distance = 1 - similarity)
+answer_cache = Chroma(
+    collection_name=ANSWER_CACHE_COLLECTION,
     embedding_function=embedding_function,
-    persist_directory="./chroma_db"
+    collection_metadata=CHROMA_HNSW_METADATA,
+    **CHROMA_STORE_KWARGS
 )
 
 
+# Vectors are kept as packed float32 (~6 KB per 1536-dim query vs ~49 KB as a float tuple)
+@functools.lru_cache(maxsize=QUERY_EMBED_CACHE_SIZE)
+def _embed_query(query: str) -> array:
+    return array("f", embedding_function.embed_query(query))
+
+async def embed_query(query: str) -> List[float]:
+    """Embed a query once; repeated queries skip the embeddings round-trip."""
+    return (await asyncio.to_thread(_embed_query, query)).tolist()
+
+
+async def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed many texts with as few provider round-trips as possible."""
+    chunks = [texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+    results = await asyncio.gather(*(embedding_function.aembed_documents(chunk) for chunk in chunks))
+    return [vector for chunk_vectors in results for vector in chunk_vectors]
+
+_persist_pending = False
+
+async def _persist_chroma_later():
+    """Coalesce persist() calls: at most one per CHROMA_PERSIST_INTERVAL seconds."""
+    global _persist_pending
+    if _persist_pending:
+        return
+    _persist_pending = True
+    try:
+        await asyncio.sleep(CHROMA_PERSIST_INTERVAL)
+    finally:
+        _persist_pending = False
+    with _team_collections_lock:
+        collections = list(_team_collections.values())
+    for collection in collections:
+        await asyncio.to_thread(collection.persist)
+
+def schedule_persist(background_tasks: BackgroundTasks):
+    if CHROMA_NEEDS_PERSIST and not CHROMA_HOST:
+        background_tasks.add_task(_persist_chroma_later)
+
+
 # -------------------------- LLM Provider -----------------------
-def get_llm(model: Optional[str] = None):
+# Identical prompts are answered from the local cache instead of re-calling the LLM
+set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
+# One client per (model, temperature); per-team request options are bound at call sites
+@functools.lru_cache(maxsize=64)
+def get_llm(model: Optional[str] = None, temperature: float = 0.2):
     if OPENAI_API_KEY:
-        return ChatOpenAI(model=model or OPENAI_MODEL, api_key=OPENAI_API_KEY, temperature=0.2)
-    return ChatOllama(model=os.getenv("OLLAMA_MODEL", "llama3.1"), temperature=0.2)
+        return ChatOpenAI(
+            model=model or OPENAI_MODEL,
+            api_key=OPENAI_API_KEY,
+            temperature=temperature,
+            http_client=openai_http_client,
+            http_async_client=openai_http_async_client,
+        )
+    return ChatOllama(model=os.getenv("OLLAMA_MODEL", "llama3.1"), temperature=temperature)
 
 
 # --------------------------- LangGraph -------------------------
 
+# Built once. Static instructions come first and the question last so that the
+# longest possible prefix is identical across calls (OpenAI prompt-prefix caching).
+NO_ANSWER = "I don’t know based on the team’s knowledge base."
+
+RAG_SYSTEM_MSG = (
+    "You are a helpful assistant that answers STRICTLY AND ONLY using the provided Context.\n"
+    "- If the Context is empty OR insufficient to answer, reply exactly with:\n"
+    f"  \"{NO_ANSWER}\"\n"
+    "- Do not use outside knowledge.\n"
+    "- Keep answers concise and quote only the relevant lines from Context."
+)
+
+RAG_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", RAG_SYSTEM_MSG),
+        ("human", "Context:\n{context}\n\nQuestion: {query}\n\nAnswer:")
+    ]
+)
+
+# Compiled graphs (and their LLM clients / connection pools) are reused across queries
+@functools.lru_cache(maxsize=256)
 def build_agent_graph(model_name: Optional[str], team_id: str, agent_type: str):
-    llm = get_llm(model_name)
+    # FAQ answers are deterministic so repeat questions hit the LLM cache
+    llm = get_llm(model_name, temperature=0.0 if agent_type == "faq" else 0.2)
+    if isinstance(llm, ChatOpenAI):
+        # prompt_cache_key pins requests sharing a prefix to the same OpenAI cache shard
+        llm = llm.bind(extra_body={"prompt_cache_key": team_id})
 
-    def retrieve_node(state: Dict[str, Any]):
+    async def retrieve_node(state: Dict[str, Any]):
         query = state["query"]
         
-        # --- MODIFIED: Search local ChromaDB ---
-        # We use relevance score to get a 0-1 similarity, which matches
-        # the original code's thresholding logic.
-        results_with_scores = chroma_client.similarity_search_with_relevance_scores(
-            query,
-            k=5,
-            filter={"team_id": team_id} # Filter by team_id in metadata
+        # --- MODIFIED: Search the team's ChromaDB collection by a cached query vector ---
+        collection = get_collection(team_id)
+        qvec = await embed_query(query)
+        results_with_distances = await asyncio.to_thread(
+            collection.similarity_search_by_vector_with_relevance_scores,
+            qvec,
+            k=5
         )
+        # Convert distances to a 0-1 relevance score; in cosine space this is the
+        # cosine similarity, which SIM_THRESHOLD is calibrated against.
+        to_relevance = collection._select_relevance_score_fn()
+        results_with_scores = [(doc, to_relevance(distance)) for doc, distance in results_with_distances]
         
         context = ""
         hits = []
@@ -143,37 +421,20 @@ def build_agent_graph(model_name: Optional[str], team_id: str, agent_type: str):
 
     
 
-    def generate_node(state: Dict[str, Any]):
+    async def generate_node(state: Dict[str, Any]):
         hits = state.get("hits") or []
         top_sim = hits[0]["_score"] if hits and hits[0].get("_score") is not None else 0.0
-        
-        # This threshold works perfectly with similarity_search_with_relevance_scores
-        SIM_THRESHOLD = 0.75 
-
-        context_text = ""
-        if hits and top_sim >= SIM_THRESHOLD:
-            context_text = "\n\n".join(
-                f"Title: {d.get('title','')}\nURL: {d.get('url','')}\nText:\n{d.get('text','')}"
-                for d in hits
-            )
 
-        system_msg = (
-            "You are a helpful assistant that answers STRICTLY AND ONLY using the provided Context.\n"
-            "- If the Context is empty OR insufficient to answer, reply exactly with:\n"
-            "  \"I don’t know based on the team’s knowledge base.\"\n"
-            "- Do not use outside knowledge.\n"
-            "- Keep answers concise and quote only the relevant lines from Context."
-        )
+        # Nothing relevant retrieved: the prompt would only produce the refusal, so skip the LLM
+        if not hits or top_sim < SIM_THRESHOLD:
+            return {"answer": NO_ANSWER, "hits": hits}
 
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", system_msg),
-                ("human", "Question: {query}\n\nContext:\n{context}\n\nAnswer:")
-            ]
+        context_text = "\n\n".join(
+            f"Title: {d.get('title','')}\nURL: {d.get('url','')}\nText:\n{d.get('text','')}"
+            for d in hits
         )
 
-        llm = get_llm()
-        res = (prompt | llm).invoke({"query": state["query"], "context": context_text})
+        res = await (RAG_PROMPT | llm).ainvoke({"query": state["query"], "context": context_text})
 
         return {"answer": res.content, "hits": hits}
 
@@ -187,26 +448,86 @@ def build_agent_graph(model_name: Optional[str], team_id: str, agent_type: str):
     return sg.compile()
 
 
+# --------------------------- Answer Cache ----------------------
+
+INTENT_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        ("system", "Decide whether two user questions ask for the same information. Reply with only 'yes' or 'no'."),
+        ("human", "Question A: {a}\nQuestion B: {b}")
+    ]
+)
+
+def _answer_cache_filter(team_id: str, agent_type: str) -> Dict[str, Any]:
+    return {"$and": [{"team_id": team_id}, {"agent_type": agent_type}]}
+
+async def _same_intent(query: str, cached_query: str) -> bool:
+    res = await (INTENT_PROMPT | get_llm(OPENAI_MODEL, temperature=0.0)).ainvoke({"a": query, "b": cached_query})
+    return res.content.strip().lower().startswith("yes")
+
+async def lookup_cached_answer(team_id: str, agent_type: str, query: str, qvec: List[float]) -> Optional[Dict[str, Any]]:
+    """Return a previous answer for a semantically equivalent question, if any."""
+    results = await asyncio.to_thread(
+        answer_cache.similarity_search_by_vector_with_relevance_scores,
+        qvec,
+        k=1,
+        filter=_answer_cache_filter(team_id, agent_type)
+    )
+    if not results:
+        return None
+
+    doc, distance = results[0]
+    similarity = 1.0 - distance
+    if similarity < SEMANTIC_CACHE_GRAY_ZONE:
+        return None
+    if similarity < SEMANTIC_CACHE_THRESHOLD and not await _same_intent(query, doc.page_content):
+        return None
+    return {"answer": doc.metadata["answer"], "hits": orjson.loads(doc.metadata["hits_json"])}
+
+async def store_cached_answer(team_id: str, agent_type: str, query: str, qvec: List[float], result: Dict[str, Any]):
+    await asyncio.to_thread(
+        answer_cache._collection.upsert,
+        ids=[uuid.uuid4().hex],
+        embeddings=[qvec],
+        documents=[query],
+        metadatas=[{
+            "team_id": team_id,
+            "agent_type": agent_type,
+            "answer": result.get("answer") or "",
+            "hits_json": orjson.dumps(result.get("hits") or []).decode(),
+        }]
+    )
+
+def invalidate_cached_answers(team_id: str):
+    """Drop a team's cached answers once its knowledge base changes."""
+    answer_cache._collection.delete(where={"team_id": team_id})
+    db_delete_exact_answers(team_id)
+
+
 # --------------------------- FastAPI ---------------------------
-app = FastAPI(title="Local-First Agent Platform (TinyDB + ChromaDB)", version="1.0")
+app = FastAPI(
+    title="Local-First Agent Platform (SQLite + ChromaDB)",
+    version="1.0",
+    default_response_class=ORJSONResponse  # orjson encodes large hit/embedding payloads much faster
+)
 
 
 @app.get("/health")
 def health():
     try:
-        # Check TinyDB
-        teams_count = len(teams_table)
-        # Check Chroma
-        chroma_count = chroma_client._collection.count()
+        # Check SQLite
+        teams_count = db_count_teams()
+        # Check Chroma with one cheap store-wide call; per-team document counts
+        # would mean opening every team's collection on each probe
+        chroma_collections = answer_cache._client.count_collections()
         return {
             "status": "ok", 
-            "tinydb_teams": teams_count, 
-            "chroma_docs": chroma_count
+            "sqlite_teams": teams_count, 
+            "chroma_collections": chroma_collections
         }
     except Exception as e:
         return {"status": "degraded", "error": str(e)}
 
-# --- MODIFIED: `create_team` endpoint (uses TinyDB) ---
+# --- MODIFIED: `create_team` endpoint (uses SQLite) ---
 @app.post("/teams")
 def create_team(data: Dict[str, str]):
     name = (data or {}).get("name") or "Untitled Team"
@@ -216,25 +537,25 @@ def create_team(data: Dict[str, str]):
     
     try:
         # We store the Pydantic-generated team_id as a field
-        teams_table.insert(doc_to_insert)
+        db_insert_team(doc_to_insert)
         return {"team_id": team.team_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create team: {e}")
 
-# --- MODIFIED: `list_teams` endpoint (uses TinyDB) ---
+# --- MODIFIED: `list_teams` endpoint (uses SQLite) ---
 @app.get("/teams")
 def list_teams():
     try:
-        team_docs = teams_table.all()
+        team_docs = db_list_teams()
         return [Team.model_validate(doc) for doc in team_docs]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list teams: {e}")
 
-# --- MODIFIED: `create_agent` endpoint (uses TinyDB) ---
+# --- MODIFIED: `create_agent` endpoint (uses SQLite) ---
 @app.post("/teams/{team_id}/agents")
 def create_agent(team_id: str, data: Dict[str, str]):
     # 1. Check if team exists
-    if not teams_table.search(TeamQuery.team_id == team_id):
+    if not db_team_exists(team_id):
         raise HTTPException(status_code=404, detail="team not found")
     
     cfg = AgentConfig(
@@ -247,68 +568,145 @@ def create_agent(team_id: str, data: Dict[str, str]):
     doc_to_insert = cfg.model_dump()
     
     try:
-        agents_table.insert(doc_to_insert)
+        db_insert_agent(doc_to_insert)
         return {"agent_id": cfg.agent_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create agent: {e}")
 
 # --- MODIFIED: `ingest_document` endpoint (uses ChromaDB) ---
+def _document_metadata(team_id: str, doc: DocumentInput) -> Dict[str, Any]:
+    # Prepare metadata for Chroma
+    metadata = dict(doc.metadata or {})
+    metadata["team_id"] = team_id
+    metadata["title"] = doc.title or ""
+    metadata["url"] = doc.url or ""
+    return metadata
+
 @app.post("/teams/{team_id}/documents")
-def ingest_document(team_id: str, doc: DocumentInput):
-    if not teams_table.search(TeamQuery.team_id == team_id):
+def ingest_document(team_id: str, doc: DocumentInput, background_tasks: BackgroundTasks):
+    if not db_team_exists(team_id):
         raise HTTPException(status_code=44, detail="team not found")
         
     if not doc.text or not doc.text.strip():
         raise HTTPException(status_code=400, detail="missing text")
     try:
         doc_id = uuid.uuid4().hex
-        
-        # Prepare metadata for Chroma
-        metadata = doc.metadata or {}
-        metadata["team_id"] = team_id
-        metadata["title"] = doc.title or ""
-        metadata["url"] = doc.url or ""
 
         # Add to Chroma. This automatically embeds and inserts.
-        chroma_client.add_texts(
+        get_collection(team_id).add_texts(
             texts=[doc.text],
-            metadatas=[metadata],
+            metadatas=[_document_metadata(team_id, doc)],
             ids=[doc_id]
         )
         
-        # Make sure it's persisted to disk
-        chroma_client.persist() 
+        # Persist is deferred and coalesced across requests
+        schedule_persist(background_tasks)
+        invalidate_cached_answers(team_id)
         
         return {"status": "ok", "team_id": team_id, "doc_id": doc_id}
     except Exception as e:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"ChromaDB insert failed: {e}\n{tb}")
 
-@app.get("/debug/vector/{team_id}")
-def debug_vector(team_id: str):
+# --- NEW: `ingest_documents_batch` endpoint (one Chroma write for many docs) ---
+@app.post("/teams/{team_id}/documents/batch")
+async def ingest_documents_batch(team_id: str, docs: List[DocumentInput], background_tasks: BackgroundTasks):
+    if not await asyncio.to_thread(db_team_exists, team_id):
+        raise HTTPException(status_code=404, detail="team not found")
+
+    if not docs:
+        raise HTTPException(status_code=400, detail="no documents")
+    if any(not doc.text or not doc.text.strip() for doc in docs):
+        raise HTTPException(status_code=400, detail="missing text")
     try:
-        results = chroma_client.get(
-            where={"team_id": team_id},
-            include=["metadatas", "embeddings"]
+        doc_ids = [uuid.uuid4().hex for _ in docs]
+        texts = [doc.text for doc in docs]
+
+        # Embed up front (batched, async) and hand Chroma the vectors directly
+        vectors = await embed_texts(texts)
+        await asyncio.to_thread(
+            get_collection(team_id)._collection.upsert,
+            ids=doc_ids,
+            embeddings=vectors,
+            documents=texts,
+            metadatas=[_document_metadata(team_id, doc) for doc in docs]
         )
-        # Add embedding length for quick check
-        if results.get("embeddings"):
-            results["embedding_dim"] = len(results["embeddings"][0])
+
+        schedule_persist(background_tasks)
+        await asyncio.to_thread(invalidate_cached_answers, team_id)
+
+        return {"status": "ok", "team_id": team_id, "doc_ids": doc_ids}
+    except Exception as e:
+        tb = traceback.format_exc()
+        raise HTTPException(status_code=500, detail=f"ChromaDB insert failed: {e}\n{tb}")
+
+# --- MODIFIED: `debug_vector` is paged and leaves out embeddings unless asked ---
+@app.get("/debug/vector/{team_id}")
+def debug_vector(
+    team_id: str,
+    limit: int = Query(100, ge=1, le=DEBUG_VECTOR_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    include_embeddings: bool = False
+):
+    # Unknown ids must not create (or fail to name) a Chroma collection
+    if not db_team_exists(team_id):
+        raise HTTPException(status_code=404, detail="team not found")
+
+    try:
+        include = ["metadatas", "embeddings"] if include_embeddings else ["metadatas"]
+        collection = get_collection(team_id)
+        results = collection.get(include=include, limit=limit, offset=offset)
+        if results.get("embeddings") is not None:
+            # Chroma may hand back numpy arrays; make them JSON-serializable
+            results["embeddings"] = [list(map(float, e)) for e in results["embeddings"]]
+
+        # Add embedding length for quick check, probing a single vector only if none were returned
+        vectors = results.get("embeddings")
+        if not include_embeddings:
+            vectors = collection.get(include=["embeddings"], limit=1)["embeddings"]
+        if vectors is not None and len(vectors):
+            results["embedding_dim"] = len(vectors[0])
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# --- MODIFIED: `query_team` endpoint (uses TinyDB) ---
+# --- MODIFIED: `query_team` endpoint (uses SQLite) ---
+def _sse(data: Dict[str, Any]) -> str:
+    return f"data: {orjson.dumps(data).decode()}\n\n"
+
+
+async def _sse_once(data: Dict[str, Any]):
+    yield _sse(data)
+
+
+async def _stream_graph(graph, query: str, on_result=None):
+    """Yield SSE events: LLM tokens as they arrive, then the final answer and hits."""
+    try:
+        async for event in graph.astream_events({"query": query}, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                token = event["data"]["chunk"].content
+                if token:
+                    yield _sse({"type": "token", "content": token})
+            elif kind == "on_chain_end" and event["name"] == "generate":
+                output = event["data"]["output"]
+                yield _sse({"type": "done", "answer": output.get("answer"), "hits": output.get("hits")})
+                if on_result:
+                    await on_result(output)
+    except Exception:
+        yield _sse({"type": "error", "detail": traceback.format_exc()})
+
+
 @app.post("/teams/{team_id}/query")
-def query_team(team_id: str, payload: Dict[str, Any]):
-    # 1. Fetch team from TinyDB
-    team_doc = teams_table.get(TeamQuery.team_id == team_id)
+async def query_team(team_id: str, payload: Dict[str, Any]):
+    # 1. Fetch team from SQLite (off the event loop)
+    team_doc = await asyncio.to_thread(db_get_team, team_id)
     if not team_doc:
         raise HTTPException(status_code=404, detail="team not found")
         
-    # 2. Fetch agents for this team from TinyDB
-    agent_docs = agents_table.search(AgentQuery.team_id == team_id)
+    # 2. Fetch agents for this team from SQLite
+    agent_docs = await asyncio.to_thread(db_get_agents, team_id)
     
     # 3. Populate the Pydantic model
     team = Team.model_validate(team_doc)
@@ -325,10 +723,34 @@ def query_team(team_id: str, payload: Dict[str, Any]):
     agent_cfg = next(iter(team.agents.values()), None)
     model_name = agent_cfg.model if agent_cfg and agent_cfg.model else OPENAI_MODEL
 
+    stream = bool((payload or {}).get("stream"))
+
+    # Tiered answer cache: exact (SQLite, no embedding) -> semantic (Chroma) -> graph + LLM
+    cached = await asyncio.to_thread(db_get_exact_answer, team_id, agent_type, query)
+    if not cached:
+        qvec = await embed_query(query)
+        cached = await lookup_cached_answer(team_id, agent_type, query, qvec)
+        if cached:
+            await asyncio.to_thread(db_put_exact_answer, team_id, agent_type, query, cached)
+    if cached:
+        if stream:
+            return StreamingResponse(_sse_once({"type": "done", **cached}), media_type="text/event-stream")
+        return cached
+
+    async def cache_result(result: Dict[str, Any]):
+        await asyncio.to_thread(db_put_exact_answer, team_id, agent_type, query, result)
+        await store_cached_answer(team_id, agent_type, query, qvec, result)
+
     # The graph builder now uses team_id to filter Chroma search
     graph = build_agent_graph(model_name, team_id, agent_type)
+
+    # Opt-in Server-Sent Events: first tokens reach the client before the answer completes
+    if stream:
+        return StreamingResponse(_stream_graph(graph, query, cache_result), media_type="text/event-stream")
+
     try:
-        result = graph.invoke({"query": query})
+        result = await graph.ainvoke({"query": query})
+        await cache_result(result)
         return {"answer": result.get("answer"), "hits": result.get("hits")}
     except Exception:
         tb = traceback.format_exc()
@@ -339,6 +761,10 @@ def query_team(team_id: str, payload: Dict[str, Any]):
 """
 (Your curl commands will work exactly the same as before)
 
+0) Optional: run Chroma as its own server and point the API at it
+chroma run --path ./chroma_db --port 8001
+CHROMA_HOST=localhost CHROMA_PORT=8001 uvicorn main:app --port 8000
+
 1) Create a team
 curl -X POST http://localhost:8000/teams -H 'Content-Type: application/json' \
   -d '{"name":"Infra Team"}'
@@ -354,4 +780,8 @@ curl -X POST http://localhost:8000/teams/TEAM_ID/documents -H 'Content-Type: app
 4) Query (Local semantic search + LLM answer)
 curl -X POST http://localhost:8000/teams/TEAM_ID/query -H 'Content-Type: application/json' \
   -d '{"query":"How do I restart the API?"}'
+
+5) Query with streamed tokens (Server-Sent Events)
+curl -N -X POST http://localhost:8000/teams/TEAM_ID/query -H 'Content-Type: application/json' \
+  -d '{"query":"How do I restart the API?","stream":true}'
 """